@@ -4,6 +4,9 @@ from simple_pid import PID
 import matplotlib.pyplot as plt
 import numpy as np
 
+# Local imports
+from hover_settle import runHoverUntilSettled
+
 # Standard imports
 import time
 
@@ -66,12 +69,6 @@ def runSimulation(t_t, t_r, t_tot):
     client.enableApiControl(True)
     client.armDisarm(True)
 
-    startTime = time.time()
-
-    # Lists for data collection
-    tData = []
-    zData = []
-
     # Hover to start position - see hover_land.py
     hoverPid = PID(
         Kp=-0.4,
@@ -80,18 +77,7 @@ def runSimulation(t_t, t_r, t_tot):
         setpoint=Z_HOVER,
         sample_time=DELTA_TIME,
         output_limits=(MIN_THRUST, MAX_THRUST))
-    currentHeight = getDroneZPosition(client)
-    thrust = hoverPid(currentHeight) # Set initial thrust value
-    print("Starting at z=%.3f" % currentHeight)
-    while (time.time() - startTime < 20): # Run control loop for 20 seconds
-        tData.append(time.time() - startTime)
-        zData.append(currentHeight)
-        
-        client.moveByRollPitchYawThrottleAsync(0, 0, 0, thrust, DELTA_TIME).join()
-        currentHeight = getDroneZPosition(client)
-        thrust = hoverPid(currentHeight)
-    currentHeight = getDroneZPosition(client)
-    print("Hovering at z=%.3f" % currentHeight)
+    runHoverUntilSettled(client, hoverPid, DELTA_TIME, timeout=20)
 
     # ~~~~~~~~~~~~~~~~~~~~
 
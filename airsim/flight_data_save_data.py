@@ -4,6 +4,10 @@ from simple_pid import PID
 import matplotlib.pyplot as plt
 import numpy as np
 
+# Local imports
+from hover_settle import runHoverUntilSettled, HOVER_TIMEOUT
+from sweep_profiler import SweepProfiler
+
 # Standard imports
 import time
 import csv
@@ -45,11 +49,18 @@ def writeCSVFile(filePath, csvData):
 
 # ~~~~~~~~~~~~~~~~~~~~
 
+# Profiling parameters
+PROFILE_STACKS = False # Also sample Python stacks (adds a background thread)
+PROFILE_DIR = './local-figures'
+profiler = SweepProfiler(sampleStacks=PROFILE_STACKS)
+
 # Connect to simulator
-client = airsim.MultirotorClient()
-client.confirmConnection()
-client.enableApiControl(True)
-client.armDisarm(True)
+# Wrap the client so every call is counted as an RPC against the current phase
+with profiler.phase('connect'):
+    client = profiler.wrapClient(airsim.MultirotorClient())
+    client.confirmConnection()
+    client.enableApiControl(True)
+    client.armDisarm(True)
 
 # Define system parameters
 GROUND_Z_VAL = getDroneZPosition(client) # Starting height is considered the "ground"
@@ -64,6 +75,7 @@ globalTR = []
 globalTData = []
 globalZData = []
 globalYData = []
+globalHoverStats = []
 
 def runSimulation(t_t, t_r, t_tot):
     """
@@ -74,10 +86,9 @@ def runSimulation(t_t, t_r, t_tot):
         t_r (float): Rotation switching time
         t_tot (float): Total flight time
     """
-    client.enableApiControl(True)
-    client.armDisarm(True)
-
-    startTime = time.time()
+    with profiler.phase('setup'):
+        client.enableApiControl(True)
+        client.armDisarm(True)
 
     # Hover to start position - see hover_land.py
     hoverPid = PID(
@@ -87,15 +98,8 @@ def runSimulation(t_t, t_r, t_tot):
         setpoint=Z_HOVER,
         sample_time=DELTA_TIME,
         output_limits=(MIN_THRUST, MAX_THRUST))
-    currentHeight = getDroneZPosition(client)
-    thrust = hoverPid(currentHeight) # Set initial thrust value
-    print("Starting at z=%.3f" % currentHeight)
-    while (time.time() - startTime < 30): # Run hover loop for specified number of seconds
-        client.moveByRollPitchYawThrottleAsync(0, 0, 0, thrust, DELTA_TIME).join()
-        currentHeight = getDroneZPosition(client)
-        thrust = hoverPid(currentHeight)
-    currentHeight = getDroneZPosition(client)
-    print("Hovering at z=%.3f" % currentHeight)
+    with profiler.phase('hover'):
+        hoverStats = runHoverUntilSettled(client, hoverPid, DELTA_TIME)
 
     # ~~~~~~~~~~~~~~~~~~~~
 
@@ -105,41 +109,46 @@ def runSimulation(t_t, t_r, t_tot):
     tData = []
     zData = []
     yData = []
-    print("Starting flight sequence")
-    currentTime = 0
-    roll = 0 # Start with no roll
-    while (currentTime < t_tot):
-        # Data capture
-        tData.append(currentTime)
-        # Use -z so our final results use +z as the up direction
-        # Also adjust z to be relative to the starting position
-        zData.append(-(getDroneZPosition(client) - Z_HOVER))
-        yData.append(getDroneYPosition(client))
-
-        # Set thrust and roll for next time segment
-        thrust = MIN_THRUST if (currentTime < t_t) else MAX_THRUST
-        roll = roll + ROT_SPEED * DELTA_TIME if (currentTime < t_r) else roll
-
-        # Move
-        # Use roll for rotation
-        client.simPause(False)
-        client.moveByRollPitchYawThrottleAsync(roll, 0, 0, thrust, DELTA_TIME).join()
-        client.simPause(True)
-
-        # Update simulator time
-        currentTime += DELTA_TIME
+    with profiler.phase('flight'):
+        print("Starting flight sequence")
+        currentTime = 0
+        roll = 0 # Start with no roll
+        while (currentTime < t_tot):
+            # Data capture
+            tData.append(currentTime)
+            # Use -z so our final results use +z as the up direction
+            # Also adjust z to be relative to the starting position
+            zData.append(-(getDroneZPosition(client) - Z_HOVER))
+            yData.append(getDroneYPosition(client))
+
+            # Set thrust and roll for next time segment
+            thrust = MIN_THRUST if (currentTime < t_t) else MAX_THRUST
+            roll = roll + ROT_SPEED * DELTA_TIME if (currentTime < t_r) else roll
+
+            # Move
+            # Use roll for rotation
+            with profiler.phase('pause'):
+                client.simPause(False)
+            client.moveByRollPitchYawThrottleAsync(roll, 0, 0, thrust, DELTA_TIME).join()
+            with profiler.phase('pause'):
+                client.simPause(True)
+
+            # Update simulator time
+            currentTime += DELTA_TIME
     
     # Save data for run in global data matrices
     globalTData.append(tData)
     globalYData.append(yData)
     globalZData.append(zData)
     globalTR.append(t_r)
+    globalHoverStats.append(hoverStats)
 
     # Reset simulator
     print("Resetting simulator...")
-    client.simPause(False)
-    client.reset()
-    time.sleep(2)
+    with profiler.phase('reset'):
+        client.simPause(False)
+        client.reset()
+        time.sleep(2)
 
 # Run a series of simulations
 print("Running multiple-simulation series...")
@@ -147,19 +156,41 @@ t_tot = 5
 t_t = 0
 for x in range(0, int(5 / 0.2) + 1):
     t_r = x * 0.2
+    profiler.startRun(t_t=t_t, t_r=t_r, t_tot=t_tot)
     runSimulation(t_t, t_r, t_tot)
+    profiler.endRun()
 
 # Save data to CSV files
-with open('./local-figures/t_r_data.csv', 'w', newline='') as csvfile:
-    csvWriter = csv.writer(csvfile)
-    csvWriter.writerow(globalTR)
-writeCSVFile('./local-figures/t_data.csv', globalTData)
-writeCSVFile('./local-figures/y_data.csv', globalYData)
-writeCSVFile('./local-figures/z_data.csv', globalZData)
+with profiler.phase('csv_write'):
+    with open('./local-figures/t_r_data.csv', 'w', newline='') as csvfile:
+        csvWriter = csv.writer(csvfile)
+        csvWriter.writerow(globalTR)
+    writeCSVFile('./local-figures/t_data.csv', globalTData)
+    writeCSVFile('./local-figures/y_data.csv', globalYData)
+    writeCSVFile('./local-figures/z_data.csv', globalZData)
+
+    # Save hover convergence stats, one row per run
+    hoverStatsKeys = ['settled', 'settleTime', 'hoverTime', 'overshoot', 'finalZ']
+    writeCSVFile('./local-figures/hover_stats.csv',
+        [['t_r'] + hoverStatsKeys] + [[t_r] + [stats[key] for key in hoverStatsKeys]
+            for t_r, stats in zip(globalTR, globalHoverStats)])
+
+totalHoverTime = sum(stats['hoverTime'] for stats in globalHoverStats)
+print("Total hover time: %.2fs over %d runs (%d settled), %.2fs saved vs. a fixed %ds hover"
+    % (totalHoverTime, len(globalHoverStats), sum(stats['settled'] for stats in globalHoverStats),
+        len(globalHoverStats) * HOVER_TIMEOUT - totalHoverTime, HOVER_TIMEOUT))
 
 # Wait for a short time, then clean up simulator
-time.sleep(5)
-print("Cleaning up simulator...")
-client.armDisarm(False)
-client.reset()
-client.enableApiControl(False)
+with profiler.phase('cleanup'):
+    time.sleep(5)
+    print("Cleaning up simulator...")
+    client.armDisarm(False)
+    client.reset()
+    client.enableApiControl(False)
+
+# Save profiling report, timestamped so sweeps can be compared over time
+profileName = time.strftime('%Y-%m-%d-%H%M%S') + '-sweep-profile'
+profileReport = profiler.writeReport(
+    '%s/%s.json' % (PROFILE_DIR, profileName),
+    '%s/%s-stacks.folded' % (PROFILE_DIR, profileName) if PROFILE_STACKS else None)
+profiler.printSummary(profileReport)
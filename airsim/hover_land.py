@@ -2,6 +2,9 @@
 import airsim
 from simple_pid import PID
 
+# Local imports
+from hover_settle import runHoverUntilSettled
+
 # Standard imports
 import time
 
@@ -40,7 +43,6 @@ MAX_THRUST = 1.0
 # Note: min thrust to overcome gravity: 0.58 in simulation
 # Note: max thrust supported in airsim: 1
 DELTA_TIME = 0.01 # Crazyflie docs suggest tick rate of 100Hz
-startTime = time.time()
 
 # Create movement controller
 # Note: airsim uses a coordinate system where -z is up and +z is down
@@ -55,25 +57,10 @@ hoverPid = PID(
     setpoint=Z_TARGET,
     sample_time=DELTA_TIME,
     output_limits=(MIN_THRUST, MAX_THRUST))
-currentHeight = getDroneZPosition(client)
-thrust = hoverPid(currentHeight) # Set initial thrust value
-
-# Fly up and hover
-print("Starting at z=%.3f" % currentHeight)
-while (time.time() - startTime < 20): # Run control loop for 20 seconds
-    # Apply thrust
-    client.moveByRollPitchYawThrottleAsync(0, 0, 0, thrust, DELTA_TIME).join()
-
-    # Calculate next thrust value from the PID based on new position
-    currentHeight = getDroneZPosition(client)
-    thrust = hoverPid(currentHeight)
-
-    # No need to sleep here in simulation, since the move command takes time
-    #  to execute, but on the drone I think we'd want to sleep here
-    # time.sleep(DELTA_TIME)
 
+# Fly up and hover until settled
+hoverStats = runHoverUntilSettled(client, hoverPid, DELTA_TIME, timeout=20)
 currentHeight = getDroneZPosition(client)
-print("Hovering at z=%.3f" % currentHeight)
 
 # Landing sequence, when starting from hover
 # Just apply low thrust (not quite enough to overcome gravity)
@@ -0,0 +1,106 @@
+# Standard imports
+import time
+from collections import deque
+
+# Default settle-detection parameters
+Z_TOLERANCE = 0.1 # Max altitude error (in meters) to count as settled
+VZ_TOLERANCE = 0.05 # Max vertical speed (in m/s) to count as settled
+SETTLE_WINDOW = 1.0 # Time (in seconds) the drone must stay within tolerance
+HOVER_TIMEOUT = 30 # Give up waiting for the drone to settle after this many seconds
+
+def getDroneZState(multirotorClient):
+    """
+    Get the height and vertical velocity of the drone from a single state query.
+
+    Args:
+        multirotorClient (airsim.MultirotorClient): The airsim client object
+
+    Returns:
+        zPosition (float): The z position of the drone associated with this client
+        zVelocity (float): The z velocity of the drone associated with this client
+    """
+    kinematics = multirotorClient.getMultirotorState().kinematics_estimated
+    return kinematics.position.z_val, kinematics.linear_velocity.z_val
+
+def runHoverUntilSettled(
+        multirotorClient,
+        hoverPid,
+        deltaTime,
+        zTolerance=Z_TOLERANCE,
+        vzTolerance=VZ_TOLERANCE,
+        settleWindow=SETTLE_WINDOW,
+        timeout=HOVER_TIMEOUT):
+    """
+    Fly the drone to the PID setpoint and hold it there until it has settled.
+
+    The drone counts as settled once every sample over the last settleWindow
+    seconds has an altitude error within zTolerance and a vertical speed within
+    vzTolerance. If that never happens, the loop gives up after timeout seconds
+    and prints a diagnostic.
+
+    Args:
+        multirotorClient (airsim.MultirotorClient): The airsim client object
+        hoverPid (simple_pid.PID): Thrust controller, with the target z as its setpoint
+        deltaTime (float): Duration of each thrust command, in seconds
+        zTolerance (float): Max altitude error to count as settled
+        vzTolerance (float): Max vertical speed to count as settled
+        settleWindow (float): Time the drone must stay within tolerance
+        timeout (float): Max time to spend in the hover loop
+
+    Returns:
+        hoverStats (dict): Convergence statistics for this hover, with keys
+            settled (bool): Whether the drone settled before the timeout
+            settleTime (float): Time from the start of the hover until the drone
+                entered the tolerance band for good (None if it never settled)
+            hoverTime (float): Total time spent in the hover loop
+            overshoot (float): Max distance past the target, in the direction of travel
+            finalZ (float): z position when the hover loop exited
+    """
+    zTarget = hoverPid.setpoint
+    startTime = time.time()
+
+    currentHeight, currentVelocity = getDroneZState(multirotorClient)
+    # Note: airsim uses -z as up, so check which way we're travelling
+    #   to know which side of the target counts as overshoot
+    direction = 1 if zTarget > currentHeight else -1
+    overshoot = 0.0
+    thrust = hoverPid(currentHeight) # Set initial thrust value
+    print("Starting at z=%.3f" % currentHeight)
+
+    # Samples of (time, altitude error, vertical velocity) within the settle window
+    window = deque()
+    settled = False
+    elapsed = 0.0
+    while (elapsed < timeout):
+        multirotorClient.moveByRollPitchYawThrottleAsync(0, 0, 0, thrust, deltaTime).join()
+        currentHeight, currentVelocity = getDroneZState(multirotorClient)
+        thrust = hoverPid(currentHeight)
+        # No need to sleep here in simulation, since the move command takes time
+        #  to execute, but on the drone I think we'd want to sleep here
+        elapsed = time.time() - startTime
+
+        overshoot = max(overshoot, (currentHeight - zTarget) * direction)
+
+        # Any sample outside the tolerance band restarts the window
+        if (abs(currentHeight - zTarget) > zTolerance or abs(currentVelocity) > vzTolerance):
+            window.clear()
+            continue
+        window.append((elapsed, currentHeight - zTarget, currentVelocity))
+        if (window[-1][0] - window[0][0] >= settleWindow):
+            settled = True
+            break
+
+    hoverStats = {
+        'settled': settled,
+        'settleTime': window[0][0] if settled else None,
+        'hoverTime': elapsed,
+        'overshoot': overshoot,
+        'finalZ': currentHeight,
+    }
+    if settled:
+        print("Hovering at z=%.3f (settled after %.2fs, overshoot %.3f)"
+            % (currentHeight, hoverStats['settleTime'], overshoot))
+    else:
+        print("Hover timed out after %.2fs without settling: z=%.3f (error %.3f, tolerance %.3f), vz=%.3f (tolerance %.3f)"
+            % (elapsed, currentHeight, currentHeight - zTarget, zTolerance, currentVelocity, vzTolerance))
+    return hoverStats
@@ -0,0 +1,261 @@
+# Standard imports
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+SWEEP_RUN_NAME = 'sweep' # Bucket for phases that happen outside of any run
+
+class SweepProfiler:
+    """
+    Attributes wall time and RPC counts to named phases of a simulation sweep.
+
+    Usage:
+        profiler = SweepProfiler()
+        client = profiler.wrapClient(airsim.MultirotorClient())
+        profiler.startRun(t_r=0.2)
+        with profiler.phase('hover'):
+            ...
+        profiler.endRun()
+        profiler.writeReport('./local-figures/sweep_profile.json')
+
+    Phases can be nested. Time and RPCs are attributed to the innermost phase
+    only, so the phase totals for a run add up to the run's wall time
+    (minus anything spent outside every phase, which is reported as 'other').
+
+    If sampleStacks is set, a background thread also samples the main
+    thread's Python stack every sampleInterval seconds. Samples are stored
+    in folded format (root first, frames separated by ';'), prefixed with
+    the active phase, so they can be fed straight into flamegraph tools.
+    """
+
+    def __init__(self, sampleStacks=False, sampleInterval=0.005):
+        self.runs = []
+        self.stacks = defaultdict(int)
+        self.sampleInterval = sampleInterval
+        self._phaseStack = []
+        self._lastMark = None
+        self._startTime = time.time()
+        self._sweepRun = self._newRun(SWEEP_RUN_NAME, {})
+        self._currentRun = self._sweepRun
+
+        self._sampler = None
+        self._stopSampling = threading.Event()
+        if sampleStacks:
+            self._mainThreadId = threading.get_ident()
+            self._sampler = threading.Thread(target=self._sampleStacks, daemon=True)
+            self._sampler.start()
+
+    def _newRun(self, name, params):
+        return {
+            'name': name,
+            'params': params,
+            'start': time.perf_counter(),
+            'wallTime': 0.0,
+            'phases': defaultdict(lambda: {'wallTime': 0.0, 'rpcCount': 0, 'entries': 0}),
+            'rpcs': defaultdict(int),
+        }
+
+    def _mark(self):
+        """
+        Attribute time since the last mark to the innermost active phase.
+        """
+        now = time.perf_counter()
+        if self._phaseStack:
+            self._currentRun['phases'][self._phaseStack[-1]]['wallTime'] += now - self._lastMark
+        self._lastMark = now
+
+    def startRun(self, **params):
+        """
+        Start attributing phases to a new run.
+
+        Args:
+            **params: Sweep parameters for this run (e.g., t_r=0.2), copied into the report
+        """
+        if self._currentRun is not self._sweepRun:
+            self.endRun()
+        self._currentRun = self._newRun('run %d' % len(self.runs), params)
+
+    def endRun(self):
+        """
+        Finish the current run. Later phases go to the sweep-level bucket until the next run starts.
+        """
+        if self._currentRun is self._sweepRun:
+            return
+        self._mark()
+        self._currentRun['wallTime'] = time.perf_counter() - self._currentRun['start']
+        self.runs.append(self._currentRun)
+        self._currentRun = self._sweepRun
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Context manager that attributes wall time and RPCs to the named phase.
+
+        Args:
+            name (str): Phase name (e.g., 'setup', 'hover', 'reset')
+        """
+        self._mark()
+        self._phaseStack.append(name)
+        self._currentRun['phases'][name]['entries'] += 1
+        try:
+            yield
+        finally:
+            self._mark()
+            self._phaseStack.pop()
+
+    def countRpc(self, methodName):
+        """
+        Record one RPC against the current run and innermost phase.
+
+        Args:
+            methodName (str): Name of the client method that was called
+        """
+        phaseName = self._phaseStack[-1] if self._phaseStack else 'other'
+        self._currentRun['phases'][phaseName]['rpcCount'] += 1
+        self._currentRun['rpcs'][methodName] += 1
+
+    def wrapClient(self, client):
+        """
+        Wrap an airsim client so that every method call is counted as an RPC.
+
+        Args:
+            client (airsim.MultirotorClient): The airsim client object
+
+        Returns:
+            wrappedClient (_CountingClient): Drop-in replacement for the client
+        """
+        return _CountingClient(client, self)
+
+    def _sampleStacks(self):
+        while not self._stopSampling.wait(self.sampleInterval):
+            frame = sys._current_frames().get(self._mainThreadId)
+            if frame is None:
+                continue
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append('%s (%s:%d)' % (code.co_name, code.co_filename, frame.f_lineno))
+                frame = frame.f_back
+            phaseStack = list(self._phaseStack)
+            phaseName = phaseStack[-1] if phaseStack else 'other'
+            self.stacks[';'.join(['phase:' + phaseName] + frames[::-1])] += 1
+
+    def _summarizeRun(self, run):
+        phases = {name: dict(stats) for name, stats in run['phases'].items()}
+        wallTime = run['wallTime']
+        # Sweep-level phases aren't one contiguous span, so only count the time spent in them
+        if run is self._sweepRun:
+            wallTime = sum(stats['wallTime'] for stats in phases.values())
+        untracked = wallTime - sum(stats['wallTime'] for stats in phases.values())
+        if untracked > 0:
+            phases.setdefault('other', {'wallTime': 0.0, 'rpcCount': 0, 'entries': 0})
+            phases['other']['wallTime'] += untracked
+        return {
+            'name': run['name'],
+            'params': run['params'],
+            'wallTime': wallTime,
+            'rpcCount': sum(run['rpcs'].values()),
+            'phases': phases,
+            'rpcs': dict(run['rpcs']),
+        }
+
+    def report(self):
+        """
+        Build the profiling report.
+
+        Returns:
+            report (dict): Per-run phase breakdowns, sweep-level phases, and
+                per-phase totals aggregated over the whole sweep
+        """
+        self._mark()
+        totalWallTime = time.time() - self._startTime
+        runs = [self._summarizeRun(run) for run in self.runs]
+        sweep = self._summarizeRun(self._sweepRun)
+
+        # Aggregate each phase over every run plus the sweep-level bucket
+        phaseTotals = {}
+        for summary in runs + [sweep]:
+            for name, stats in summary['phases'].items():
+                total = phaseTotals.setdefault(name, {
+                    'wallTime': 0.0, 'rpcCount': 0, 'entries': 0, 'runs': 0,
+                    'minWallTime': None, 'maxWallTime': None,
+                })
+                total['wallTime'] += stats['wallTime']
+                total['rpcCount'] += stats['rpcCount']
+                total['entries'] += stats['entries']
+                if summary is sweep:
+                    continue
+                total['runs'] += 1
+                total['minWallTime'] = stats['wallTime'] if total['minWallTime'] is None else min(total['minWallTime'], stats['wallTime'])
+                total['maxWallTime'] = stats['wallTime'] if total['maxWallTime'] is None else max(total['maxWallTime'], stats['wallTime'])
+        for total in phaseTotals.values():
+            total['meanWallTime'] = total['wallTime'] / total['runs'] if total['runs'] else None
+            total['fraction'] = total['wallTime'] / totalWallTime if totalWallTime > 0 else 0.0
+
+        return {
+            'startTime': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self._startTime)),
+            'wallTime': totalWallTime,
+            'rpcCount': sum(summary['rpcCount'] for summary in runs + [sweep]),
+            'phaseTotals': phaseTotals,
+            'runs': runs,
+            'sweepPhases': sweep['phases'],
+            'stackSamples': sum(self.stacks.values()),
+        }
+
+    def printSummary(self, report):
+        """
+        Print a per-phase wall time breakdown, largest first.
+
+        Args:
+            report (dict): Report returned by report()
+        """
+        print("Sweep took %.2fs with %d RPCs over %d runs"
+            % (report['wallTime'], report['rpcCount'], len(report['runs'])))
+        phaseTotals = sorted(report['phaseTotals'].items(), key=lambda item: -item[1]['wallTime'])
+        for name, total in phaseTotals:
+            print("  %-12s %8.2fs (%5.1f%%) %7d RPCs"
+                % (name, total['wallTime'], 100 * total['fraction'], total['rpcCount']))
+
+    def writeReport(self, filePath, stacksFilePath=None):
+        """
+        Stop stack sampling and write the report as JSON.
+
+        Args:
+            filePath (str): Path for the JSON report
+            stacksFilePath (str): Optional path for the folded stack samples
+
+        Returns:
+            report (dict): The report that was written
+        """
+        if self._sampler is not None:
+            self._stopSampling.set()
+            self._sampler.join()
+        report = self.report()
+        with open(filePath, 'w') as reportFile:
+            json.dump(report, reportFile, indent=2)
+        if stacksFilePath is not None and self.stacks:
+            with open(stacksFilePath, 'w') as stacksFile:
+                for stack, count in sorted(self.stacks.items()):
+                    stacksFile.write('%s %d\n' % (stack, count))
+        return report
+
+class _CountingClient:
+    """
+    Proxy for an airsim client that counts each method call as an RPC.
+    """
+
+    def __init__(self, client, profiler):
+        self._client = client
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+        def countedCall(*args, **kwargs):
+            self._profiler.countRpc(name)
+            return attr(*args, **kwargs)
+        return countedCall
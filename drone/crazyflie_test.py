@@ -5,6 +5,7 @@ from simple_pid import PID
 
 
 from threading import Thread
+from collections import deque
 
 import cflib.crtp
 from cflib.crazyflie import Crazyflie
@@ -26,17 +27,22 @@ MAX_THRUST = 47000 # NOTE: max supported is 60000, 45000 ia enough to move the d
 AVG_THRUST = int((MIN_THRUST + MAX_THRUST) / 2)
 DELTA_TIME = 0.02 # In seconds
 LOG_INTERVAL_MS = 50 # In milliseconds
-HOVER_DURATION = 5 # In seconds
+HOVER_DURATION = 5 # In seconds, max time to wait for the hover to settle
+HOVER_Z_TOLERANCE = 0.05 # In meters, max altitude error to count as settled
+HOVER_VZ_TOLERANCE = 0.05 # In m/s, max vertical speed to count as settled
+HOVER_SETTLE_WINDOW = 0.5 # In seconds, time the drone must stay within tolerance
 LANDING_SPEED = 0.2 # In m/s
 LANDING_DECREMENT = 0.1 # In meters
 
 # Log parameter names
 PARAM_Z_POS = 'stateEstimate.z'
+PARAM_Z_VEL = 'stateEstimate.vz'
 PARAM_ROLL = 'stateEstimate.roll'
 PARAM_PITCH = 'stateEstimate.pitch'
 
 # Globals
 _drone_z_position = 0.0
+_drone_z_velocity = 0.0
 _drone_roll = 0.0
 _drone_pitch = 0.0
 
@@ -50,10 +56,12 @@ def unlock_setpoint_commands(cf):
 # Logger for position data
 def set_drone_log_vars(timestamp, log_data, log_config_name):
     global _drone_z_position
+    global _drone_z_velocity
     global _drone_roll
     global _drone_pitch
 
     _drone_z_position = log_data[PARAM_Z_POS] # Update z position global variable
+    _drone_z_velocity = log_data[PARAM_Z_VEL] # Update z velocity global variable
     _drone_roll = log_data[PARAM_ROLL] # Update roll global variable
     _drone_pitch = log_data[PARAM_PITCH] # Update pitch global variable
     print('z: %.3f, roll: %.3f, pitch: %.3f' % (_drone_z_position, _drone_roll, _drone_pitch))
@@ -64,16 +72,48 @@ def drone_vars_logging_error(log_config_name, msg):
     print('Error in logging [%s]: %s', (log_config_name, msg))
 
 # Hover to start position
+# Holds the hover setpoint until the drone has stayed within tolerance of
+#   HOVER_HEIGHT for HOVER_SETTLE_WINDOW seconds, or until HOVER_DURATION runs out
 # cf - crazyflie object
+# Returns a dict of convergence stats (settled, settle_time, hover_time, overshoot, final_z)
 def run_hover_sequence(cf):
     hover_start_time = time.time()
     current_height = _drone_z_position
     print("Starting at z=%.3f" % current_height)
-    while (time.time() - hover_start_time < HOVER_DURATION): # Run hover loop for specified number of seconds
+
+    overshoot = 0.0
+    window = deque() # Sample times since the drone last entered the tolerance band
+    settled = False
+    elapsed = 0.0
+    while (elapsed < HOVER_DURATION): # Run hover loop until settled or timed out
         cf.commander.send_hover_setpoint(0, 0, 0, HOVER_HEIGHT)
         time.sleep(DELTA_TIME)
-    current_height = _drone_z_position
-    print("Hovering at z=%.3f" % current_height)
+        elapsed = time.time() - hover_start_time
+
+        current_height = _drone_z_position
+        overshoot = max(overshoot, current_height - HOVER_HEIGHT)
+
+        # Any sample outside the tolerance band restarts the window
+        if (abs(current_height - HOVER_HEIGHT) > HOVER_Z_TOLERANCE or abs(_drone_z_velocity) > HOVER_VZ_TOLERANCE):
+            window.clear()
+            continue
+        window.append(elapsed)
+        if (window[-1] - window[0] >= HOVER_SETTLE_WINDOW):
+            settled = True
+            break
+
+    hover_stats = {
+        'settled': settled,
+        'settle_time': window[0] if settled else None,
+        'hover_time': elapsed,
+        'overshoot': overshoot,
+        'final_z': current_height,
+    }
+    if settled:
+        print("Hovering at z=%.3f (settled after %.2fs, overshoot %.3f)" % (current_height, hover_stats['settle_time'], overshoot))
+    else:
+        print("Hover timed out after %.2fs without settling: z=%.3f (error %.3f), vz=%.3f" % (elapsed, current_height, current_height - HOVER_HEIGHT, _drone_z_velocity))
+    return hover_stats
 
 # Landing sequence
 # Immediately sends a hover setpoint to stop the drone's flight, then descends slowly
@@ -142,6 +182,7 @@ if __name__ == '__main__':
         # Set up logging config
         log_config = LogConfig(name='StateValues', period_in_ms=LOG_INTERVAL_MS)
         log_config.add_variable(PARAM_Z_POS, 'float')
+        log_config.add_variable(PARAM_Z_VEL, 'float')
         log_config.add_variable(PARAM_ROLL, 'float')
         log_config.add_variable(PARAM_PITCH, 'float')
         cf.log.add_config(log_config)